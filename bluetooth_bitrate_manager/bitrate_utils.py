@@ -6,10 +6,13 @@ Shared by both GUI and CLI tooling so we have a single source of truth.
 from __future__ import annotations
 
 from dataclasses import dataclass
+import shutil
 import subprocess
 import sys
 from typing import Iterable, Optional
 
+BIN_BUSCTL = shutil.which("busctl") or "busctl"
+
 
 def _ceil_div(numerator: int, denominator: int) -> int:
     """Integer ceiling division."""
@@ -191,10 +194,11 @@ def fetch_sbc_configuration(device_address: str, timeout: float = 2.0) -> Option
     try:
         addr_formatted = device_address.replace(":", "_")
         tree = subprocess.run(
-            ["busctl", "--system", "tree", "org.bluez"],
+            [BIN_BUSCTL, "--system", "tree", "org.bluez"],
             capture_output=True,
             text=True,
             timeout=timeout,
+            close_fds=False,
         )
         if tree.returncode != 0:
             return None
@@ -215,7 +219,7 @@ def fetch_sbc_configuration(device_address: str, timeout: float = 2.0) -> Option
             try:
                 state_proc = subprocess.run(
                     [
-                        "busctl",
+                        BIN_BUSCTL,
                         "--system",
                         "get-property",
                         "org.bluez",
@@ -226,6 +230,7 @@ def fetch_sbc_configuration(device_address: str, timeout: float = 2.0) -> Option
                     capture_output=True,
                     text=True,
                     timeout=timeout,
+                    close_fds=False,
                 )
                 if state_proc.returncode == 0:
                     state = _parse_busctl_string(state_proc.stdout)
@@ -243,7 +248,7 @@ def fetch_sbc_configuration(device_address: str, timeout: float = 2.0) -> Option
 
         config = subprocess.run(
             [
-                "busctl",
+                BIN_BUSCTL,
                 "--system",
                 "get-property",
                 "org.bluez",
@@ -254,6 +259,7 @@ def fetch_sbc_configuration(device_address: str, timeout: float = 2.0) -> Option
             capture_output=True,
             text=True,
             timeout=timeout,
+            close_fds=False,
         )
 
         if config.returncode != 0:
@@ -292,6 +298,37 @@ def fetch_sbc_configuration(device_address: str, timeout: float = 2.0) -> Option
         return None
 
 
+# (device_address, codec) -> SBCConfiguration; failed lookups are never stored
+_sbc_config_cache = {}
+_SBC_CONFIG_CACHE_SIZE = 32
+
+
+def cached_sbc_configuration(device_address: str, codec: str = "") -> Optional[SBCConfiguration]:
+    """
+    Memoized :func:`fetch_sbc_configuration` for callers that refresh repeatedly.
+
+    ``codec`` is only part of the cache key, so switching e.g. SBC -> SBC-XQ forces a new
+    lookup. A ``None`` result (busctl timeout, transport not exported yet) is not cached, so
+    the next refresh tries again. Call :func:`clear_sbc_configuration_cache` when BlueZ
+    reports transport changes.
+    """
+    key = (device_address, codec)
+    config = _sbc_config_cache.get(key)
+    if config is None:
+        config = fetch_sbc_configuration(device_address)
+        if config is not None:
+            if len(_sbc_config_cache) >= _SBC_CONFIG_CACHE_SIZE:
+                # Drop the oldest entry; dicts keep insertion order.
+                del _sbc_config_cache[next(iter(_sbc_config_cache))]
+            _sbc_config_cache[key] = config
+    return config
+
+
+def clear_sbc_configuration_cache() -> None:
+    """Forget every cached SBC configuration."""
+    _sbc_config_cache.clear()
+
+
 def format_channel_mode(mode: Optional[str]) -> Optional[str]:
     """Human-readable label for an SBC channel mode identifier."""
     if not mode:
@@ -6,9 +6,10 @@ Monitors and controls Bluetooth audio bitrate settings
 
 import gi
 gi.require_version('Gtk', '4.0')
-gi.require_version('Adw', '1')
-from gi.repository import Gtk, Adw, GLib
+from gi.repository import Gtk, GLib, Gio
 import subprocess
+import json
+import codecs
 import re
 import threading
 import os
@@ -17,6 +18,7 @@ import shutil
 import tempfile
 import time
 import shlex
+from dataclasses import dataclass, fields
 from pathlib import Path
 from typing import Optional, Sequence
 from functools import lru_cache
@@ -29,11 +31,29 @@ SUDO_PATH = shutil.which("sudo")
 PKEXEC_PATH = shutil.which("pkexec")
 TRUE_PATH = shutil.which("true") or "/usr/bin/true"
 FLATPAK_SPAWN = shutil.which("flatpak-spawn")
-IS_FLATPAK = os.path.exists("/.flatpak-info") or os.getenv("FLATPAK_ID")
+BIN_PACTL = shutil.which("pactl") or "pactl"
+IS_FLATPAK = os.path.exists("/.flatpak-info") or bool(os.getenv("FLATPAK_ID"))
+# Prepended to commands that must run on the host rather than inside the sandbox
+_HOST_PREFIX = (FLATPAK_SPAWN or 'flatpak-spawn', '--host') if IS_FLATPAK else ()
+# Resolved here outside Flatpak; inside, flatpak-spawn looks it up on the host's PATH
+BIN_SYSTEMCTL = "systemctl" if IS_FLATPAK else (shutil.which("systemctl") or "systemctl")
+# Host commands looked up by the privileged and service-restart paths; probed in one go
+HOST_PROBED_COMMANDS = ("pkexec", "sudo", "systemctl", "service")
+BLUEZ_SERVICE = "org.bluez"
+BLUEZ_WATCHED_INTERFACES = ("org.bluez.Device1", "org.bluez.MediaTransport1")
+# Device1 properties that can change which audio sinks exist; RSSI/TxPower chatter is ignored
+BLUEZ_DEVICE_AUDIO_PROPERTIES = frozenset(("Connected", "ServicesResolved", "UUIDs"))
+_SAMPLE_SPEC_RE = re.compile(r'(\d+)ch\s+(\d+)Hz')
 _sudo_keepalive_thread = None
 _sudo_keepalive_lock = threading.Lock()
+_sudo_keepalive_stop = threading.Event()
+# time.monotonic() of the last time sudo confirmed a valid ticket
+_sudo_last_ok = 0.0
+# Well inside sudo's default 5 minute timestamp timeout
+SUDO_TICKET_RECHECK = 50
 
 
+@lru_cache(maxsize=1)
 def _have_tty() -> bool:
     try:
         return sys.stdin is not None and sys.stdin.isatty()
@@ -43,10 +63,13 @@ def _have_tty() -> bool:
 
 def ensure_sudo_ticket():
     """Ensure sudo timestamp is valid and spawn keepalive thread."""
-    global _sudo_keepalive_thread
+    global _sudo_keepalive_thread, _sudo_last_ok
     if not SUDO_PATH:
         raise RuntimeError("sudo not available on PATH")
 
+    if time.monotonic() - _sudo_last_ok < SUDO_TICKET_RECHECK:
+        return
+
     check = subprocess.run(
         [SUDO_PATH, "-n", "true"],
         stdout=subprocess.DEVNULL,
@@ -56,31 +79,63 @@ def ensure_sudo_ticket():
         prompt = subprocess.run([SUDO_PATH, "-v"])
         if prompt.returncode != 0:
             raise RuntimeError("sudo authorization failed")
+    _sudo_last_ok = time.monotonic()
 
     with _sudo_keepalive_lock:
         if _sudo_keepalive_thread is None:
             def _keepalive():
-                while True:
-                    time.sleep(60)
+                global _sudo_last_ok
+                # wait() returns True as soon as stop_sudo_keepalive() is called.
+                while not _sudo_keepalive_stop.wait(60):
                     result = subprocess.run(
                         [SUDO_PATH, "-n", "-v"],
                         stdout=subprocess.DEVNULL,
                         stderr=subprocess.DEVNULL,
                     )
                     if result.returncode != 0:
+                        _sudo_last_ok = 0.0
                         break
+                    _sudo_last_ok = time.monotonic()
 
             thread = threading.Thread(target=_keepalive, daemon=True)
             thread.start()
             _sudo_keepalive_thread = thread
 
 
+@lru_cache(maxsize=1)
+def _load_adw():
+    """Import Libadwaita on first use; the device parsing helpers only need Gtk/GLib."""
+    gi.require_version('Adw', '1')
+    from gi.repository import Adw
+    return Adw
+
+
+def stop_sudo_keepalive():
+    """Stop refreshing the sudo timestamp; the keepalive thread exits immediately."""
+    _sudo_keepalive_stop.set()
+
+
 def _host_command(args: Sequence[str]) -> Sequence[str]:
-    if IS_FLATPAK:
-        if not FLATPAK_SPAWN:
-            raise RuntimeError("flatpak-spawn not available inside sandbox environment.")
-        return ['flatpak-spawn', '--host', *args]
-    return args
+    if not _HOST_PREFIX:
+        return args
+    if not FLATPAK_SPAWN:
+        raise RuntimeError("flatpak-spawn not available inside sandbox environment.")
+    return [*_HOST_PREFIX, *args]
+
+
+@lru_cache(maxsize=1)
+def _host_probed_commands() -> frozenset:
+    """Check all HOST_PROBED_COMMANDS on the host with a single flatpak-spawn call."""
+    script = 'for c in "$@"; do command -v "$c" >/dev/null 2>&1 && echo "$c"; done'
+    try:
+        result = subprocess.run(
+            [FLATPAK_SPAWN, '--host', 'sh', '-c', script, 'sh', *HOST_PROBED_COMMANDS],
+            capture_output=True,
+            text=True,
+        )
+    except Exception:
+        return frozenset()
+    return frozenset(result.stdout.split())
 
 
 @lru_cache(maxsize=None)
@@ -89,6 +144,8 @@ def _host_has(command: str) -> bool:
         return shutil.which(command) is not None
     if not FLATPAK_SPAWN:
         return False
+    if command in HOST_PROBED_COMMANDS:
+        return command in _host_probed_commands()
     try:
         check = subprocess.run(
             [FLATPAK_SPAWN, '--host', 'sh', '-c', f'command -v {shlex.quote(command)}'],
@@ -117,6 +174,7 @@ def run_privileged_command(args, text_input: Optional[str] = None):
             input=text_input,
             text=True,
             capture_output=True,
+            close_fds=False,
         )
 
     if PKEXEC_PATH:
@@ -135,6 +193,7 @@ def run_privileged_command(args, text_input: Optional[str] = None):
         input=text_input,
         text=True,
         capture_output=True,
+        close_fds=False,
     )
 
 
@@ -160,197 +219,382 @@ def initialize_privileges():
     raise RuntimeError("No privilege escalation mechanism available.")
 
 
+# Placeholder for any device field we could not determine; one shared object
+_UNKNOWN = sys.intern("Unknown")
+
+# dataclass(slots=True) needs Python 3.10; on 3.9 we simply go without the memory saving.
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class BluetoothDevice:
     """Represents a Bluetooth audio device"""
-    def __init__(self, name="Unknown", description="Unknown", codec="Unknown",
-                 bitrate="Unknown", rate="Unknown", channels="Unknown",
-                 channel_mode="Unknown", block_length="Unknown", subbands="Unknown",
-                 codec_raw=""):
-        self.name = name
-        self.description = description
-        self.codec = codec
-        self.bitrate = bitrate
-        self.rate = rate
-        self.channels = channels
-        self.channel_mode = channel_mode
-        self.block_length = block_length
-        self.subbands = subbands
-        self.codec_raw = codec_raw
+    name: str = _UNKNOWN
+    description: str = _UNKNOWN
+    codec: str = _UNKNOWN
+    bitrate: str = _UNKNOWN
+    rate: str = _UNKNOWN
+    channels: str = _UNKNOWN
+    channel_mode: str = _UNKNOWN
+    block_length: str = _UNKNOWN
+    subbands: str = _UNKNOWN
+    codec_raw: str = ""
+
+
+_DEVICE_DEFAULTS = {field.name: field.default for field in fields(BluetoothDevice)}
+
+
+def _device_from_dict(current_device):
+    """Build a BluetoothDevice from a parser dict, keeping the field defaults for gaps"""
+    return BluetoothDevice(**{
+        name: current_device.get(name, default) for name, default in _DEVICE_DEFAULTS.items()
+    })
+
+
+def _flush(current_device, devices):
+    """Append the sink being parsed to ``devices`` if it is a Bluetooth one"""
+    if current_device and current_device.get('is_bluetooth'):
+        devices.append(_device_from_dict(current_device))
+
+
+# Rows shown in each device card, as (field, title) pairs.
+DEVICE_ROWS = (
+    ("codec", "Codec:"),
+    ("bitrate", "Bitrate:"),
+    ("rate", "Sample Rate:"),
+    ("channel_mode", "Channel Mode:"),
+    ("frame", "SBC Frame:"),
+    ("channels", "Channels:"),
+)
+
+
+def _kv_row(grid, row, key, value=""):
+    """Attach a "key: value" label pair to ``grid`` and return both labels"""
+    key_label = Gtk.Label(label=key)
+    key_label.set_halign(Gtk.Align.START)
+    value_label = Gtk.Label(label=value)
+    value_label.set_halign(Gtk.Align.START)
+    value_label.add_css_class("monospace")
+    grid.attach(key_label, 0, row, 1, 1)
+    grid.attach(value_label, 1, row, 1, 1)
+    return key_label, value_label
+
+
+def _device_row_values(device):
+    """Map DEVICE_ROWS fields to display text; fields that should be hidden are omitted."""
+    values = {
+        "codec": device.codec,
+        "bitrate": device.bitrate,
+    }
+    if device.rate != _UNKNOWN:
+        values["rate"] = f"{device.rate} Hz"
+    if device.channel_mode != _UNKNOWN:
+        values["channel_mode"] = device.channel_mode
+    if device.block_length != _UNKNOWN or device.subbands != _UNKNOWN:
+        parts = []
+        if device.block_length != _UNKNOWN:
+            parts.append(f"{device.block_length} blocks")
+        if device.subbands != _UNKNOWN:
+            parts.append(f"{device.subbands} subbands")
+        values["frame"] = " / ".join(parts) if parts else _UNKNOWN
+    if device.channels != _UNKNOWN:
+        values["channels"] = device.channels
+    return values
+
+
+def _apply_sbc(current_device, is_xq):
+    """Fill in SBC details, preferring the negotiated transport configuration over estimates"""
+    current_device['codec'] = 'SBC XQ' if is_xq else 'SBC'
+    fallback = '~552 kbps (est.)' if is_xq else '~328 kbps (est.)'
+
+    config = None
+    if 'address' in current_device:
+        config = bitrate_utils.cached_sbc_configuration(
+            current_device['address'], current_device['codec_raw'])
+    if not config:
+        current_device['bitrate'] = fallback
+        return
+
+    bitrate_value = bitrate_utils.sbc_bitrate_from_config(config)
+    bitpool = config.effective_bitpool
+    if bitrate_value and bitpool is not None:
+        formatted = bitrate_utils.format_bitrate(bitrate_value)
+        current_device['bitrate'] = f'{formatted} (bitpool {bitpool})'
+    else:
+        current_device['bitrate'] = fallback
+    if config.sample_rate:
+        current_device['rate'] = str(config.sample_rate)
+    if config.channel_mode:
+        mode_label = bitrate_utils.format_channel_mode(config.channel_mode)
+        if mode_label:
+            current_device['channel_mode'] = mode_label
+    if config.block_length:
+        current_device['block_length'] = str(config.block_length)
+    if config.subbands:
+        current_device['subbands'] = str(config.subbands)
+
+
+def _handle_sbc(current_device, lowered):
+    _apply_sbc(current_device, is_xq='xq' in lowered)
+
+
+def _handle_aac(current_device, lowered):
+    current_device['codec'] = 'AAC'
+    current_device['bitrate'] = '~256 kbps'
+
 
+def _handle_aptx_hd(current_device, lowered):
+    current_device['codec'] = 'aptX HD'
+    current_device['bitrate'] = '576 kbps'
+
+
+def _handle_aptx(current_device, lowered):
+    current_device['codec'] = 'aptX'
+    current_device['bitrate'] = '352 kbps'
+
+
+def _handle_ldac(current_device, lowered):
+    current_device['codec'] = 'LDAC'
+    if 'hq' in lowered:
+        current_device['bitrate'] = '~990 kbps'
+    elif 'sq' in lowered:
+        current_device['bitrate'] = '~660 kbps'
+    else:
+        current_device['bitrate'] = '~330-990 kbps'
+
+
+def _handle_msbc(current_device, lowered):
+    current_device['codec'] = 'mSBC'
+    current_device['bitrate'] = '~64 kbps'
+
+
+def _handle_cvsd(current_device, lowered):
+    current_device['codec'] = 'CVSD'
+    current_device['bitrate'] = '~64 kbps'
+
+
+# Substring -> handler, checked in order. More specific names come first so that
+# e.g. "aptx_hd" is not taken for "aptx" and "msbc" is not taken for "sbc".
+_CODEC_TABLE = (
+    ('aptx_hd', _handle_aptx_hd),
+    ('aptx', _handle_aptx),
+    ('ldac', _handle_ldac),
+    ('msbc', _handle_msbc),
+    ('cvsd', _handle_cvsd),
+    ('aac', _handle_aac),
+    ('sbc', _handle_sbc),
+)
+
+
+@lru_cache(maxsize=None)
+def _codec_handler(codec):
+    """Lowercase ``codec`` and find its _CODEC_TABLE handler, once per distinct codec name"""
+    lowered = codec.lower()
+    for substring, handler in _CODEC_TABLE:
+        if substring in lowered:
+            return lowered, handler
+    return lowered, None
+
+
+def _decode_codec(current_device, codec):
+    """Fill in the display codec and bitrate for a raw api.bluez5.codec value"""
+    current_device['codec_raw'] = codec
+    lowered, handler = _codec_handler(codec)
+    if handler is not None:
+        handler(current_device, lowered)
+    else:
+        current_device['codec'] = codec.upper()
 
 class BitrateMonitor:
     """Monitors Bluetooth device bitrates"""
 
-    @staticmethod
-    def get_bluetooth_devices():
+    # pactl only gained --format=json in PulseAudio 16; cleared once the text fallback is needed.
+    _pactl_json = True
+
+    @classmethod
+    def get_bluetooth_devices(cls):
         """Get Bluetooth audio devices and their codec info"""
+        if cls._pactl_json:
+            devices = cls._get_devices_json()
+            if devices is not None:
+                return devices
+
+        devices = cls._get_devices_text()
+        if devices is None:
+            return []
+        cls._pactl_json = False
+        return devices
+
+    @staticmethod
+    def _get_devices_json():
+        """Read sinks from `pactl --format=json`; returns None if that is unavailable"""
         try:
-            result = subprocess.run(['pactl', 'list', 'sinks'],
-                                  capture_output=True, text=True, timeout=5)
+            result = subprocess.run([BIN_PACTL, '--format=json', 'list', 'sinks'],
+                                    capture_output=True, timeout=5, close_fds=False)
             if result.returncode != 0:
-                return []
-
-            devices = []
-            current_device = None
-
-            for line in result.stdout.split('\n'):
-                if line.startswith('Sink #'):
-                    if current_device and current_device.get('is_bluetooth'):
-                        device = BluetoothDevice(
-                            name=current_device.get('name', 'Unknown'),
-                            description=current_device.get('description', 'Unknown'),
-                            codec=current_device.get('codec', 'Unknown'),
-                            bitrate=current_device.get('bitrate', 'Unknown'),
-                            rate=current_device.get('rate', 'Unknown'),
-                            channels=current_device.get('channels', 'Unknown'),
-                            channel_mode=current_device.get('channel_mode', 'Unknown'),
-                            block_length=current_device.get('block_length', 'Unknown'),
-                            subbands=current_device.get('subbands', 'Unknown'),
-                            codec_raw=current_device.get('codec_raw', '')
-                        )
-                        devices.append(device)
-                    current_device = {
-                        'is_bluetooth': False,
-                        'channel_mode': 'Unknown',
-                        'block_length': 'Unknown',
-                        'subbands': 'Unknown'
-                    }
-                elif current_device:
-                    if 'Name:' in line:
-                        name = line.split(':', 1)[1].strip()
-                        current_device['name'] = name
-                        if 'bluez' in name:
-                            current_device['is_bluetooth'] = True
-                    elif 'Description:' in line:
-                        current_device['description'] = line.split(':', 1)[1].strip()
-                    elif 'api.bluez5.address' in line:
-                        address = line.split('=')[1].strip().strip('"')
-                        current_device['address'] = address
-                    elif 'api.bluez5.codec' in line:
-                        codec = line.split('=')[1].strip().strip('"')
-                        current_device['codec_raw'] = codec
-                        # Decode codec names
-                        if 'sbc' in codec.lower():
-                            if 'xq' in codec.lower():
-                                current_device['codec'] = 'SBC XQ'
-                                # Try to get actual bitpool for SBC
-                                if 'address' in current_device:
-                                    config = bitrate_utils.fetch_sbc_configuration(current_device['address'])
-                                    if config:
-                                        bitrate_value = bitrate_utils.sbc_bitrate_from_config(config)
-                                        bitpool = config.effective_bitpool
-                                        if bitrate_value and bitpool is not None:
-                                            formatted = bitrate_utils.format_bitrate(bitrate_value)
-                                            current_device['bitrate'] = f'{formatted} (bitpool {bitpool})'
-                                        else:
-                                            current_device['bitrate'] = '~552 kbps (est.)'
-                                        if config.sample_rate:
-                                            current_device['rate'] = str(config.sample_rate)
-                                        if config.channel_mode:
-                                            mode_label = bitrate_utils.format_channel_mode(config.channel_mode)
-                                            if mode_label:
-                                                current_device['channel_mode'] = mode_label
-                                        if config.block_length:
-                                            current_device['block_length'] = str(config.block_length)
-                                        if config.subbands:
-                                            current_device['subbands'] = str(config.subbands)
-                                    else:
-                                        current_device['bitrate'] = '~552 kbps (est.)'
-                                else:
-                                    current_device['bitrate'] = '~552 kbps (est.)'
-                            else:
-                                current_device['codec'] = 'SBC'
-                                # Standard SBC estimation
-                                if 'address' in current_device:
-                                    config = bitrate_utils.fetch_sbc_configuration(current_device['address'])
-                                    if config:
-                                        bitrate_value = bitrate_utils.sbc_bitrate_from_config(config)
-                                        bitpool = config.effective_bitpool
-                                        if bitrate_value and bitpool is not None:
-                                            formatted = bitrate_utils.format_bitrate(bitrate_value)
-                                            current_device['bitrate'] = f'{formatted} (bitpool {bitpool})'
-                                        else:
-                                            current_device['bitrate'] = '~328 kbps (est.)'
-                                        if config.sample_rate:
-                                            current_device['rate'] = str(config.sample_rate)
-                                        if config.channel_mode:
-                                            mode_label = bitrate_utils.format_channel_mode(config.channel_mode)
-                                            if mode_label:
-                                                current_device['channel_mode'] = mode_label
-                                        if config.block_length:
-                                            current_device['block_length'] = str(config.block_length)
-                                        if config.subbands:
-                                            current_device['subbands'] = str(config.subbands)
-                                    else:
-                                        current_device['bitrate'] = '~328 kbps (est.)'
-                                else:
-                                    current_device['bitrate'] = '~328 kbps (est.)'
-                        elif 'aac' in codec.lower():
-                            current_device['codec'] = 'AAC'
-                            current_device['bitrate'] = '~256 kbps'
-                        elif 'aptx_hd' in codec.lower():
-                            current_device['codec'] = 'aptX HD'
-                            current_device['bitrate'] = '576 kbps'
-                        elif 'aptx' in codec.lower():
-                            current_device['codec'] = 'aptX'
-                            current_device['bitrate'] = '352 kbps'
-                        elif 'ldac' in codec.lower():
-                            current_device['codec'] = 'LDAC'
-                            if 'hq' in codec.lower():
-                                current_device['bitrate'] = '~990 kbps'
-                            elif 'sq' in codec.lower():
-                                current_device['bitrate'] = '~660 kbps'
-                            else:
-                                current_device['bitrate'] = '~330-990 kbps'
-                        elif 'msbc' in codec.lower():
-                            current_device['codec'] = 'mSBC'
-                            current_device['bitrate'] = '~64 kbps'
-                        elif 'cvsd' in codec.lower():
-                            current_device['codec'] = 'CVSD'
-                            current_device['bitrate'] = '~64 kbps'
-                        else:
-                            current_device['codec'] = codec.upper()
-                    elif 'Sample Specification:' in line:
-                        spec = line.split(':', 1)[1].strip()
-                        match = re.search(r'(\d+)ch\s+(\d+)Hz', spec)
-                        if match:
-                            current_device['channels'] = match.group(1)
-                            current_device['rate'] = match.group(2)
-
-            if current_device and current_device.get('is_bluetooth'):
-                device = BluetoothDevice(
-                    name=current_device.get('name', 'Unknown'),
-                    description=current_device.get('description', 'Unknown'),
-                    codec=current_device.get('codec', 'Unknown'),
-                    bitrate=current_device.get('bitrate', 'Unknown'),
-                    rate=current_device.get('rate', 'Unknown'),
-                    channels=current_device.get('channels', 'Unknown'),
-                    channel_mode=current_device.get('channel_mode', 'Unknown'),
-                    block_length=current_device.get('block_length', 'Unknown'),
-                    subbands=current_device.get('subbands', 'Unknown'),
-                    codec_raw=current_device.get('codec_raw', '')
-                )
-                devices.append(device)
+                return None
+            sinks = json.loads(result.stdout)
+        except (OSError, subprocess.TimeoutExpired, ValueError):
+            return None
+
+        devices = []
+        for sink in sinks:
+            name = sink.get('name', '')
+            if 'bluez' not in name:
+                continue
+
+            properties = sink.get('properties', {})
+            current_device = {
+                'is_bluetooth': True,
+                'name': name,
+                'description': sink.get('description', _UNKNOWN),
+                'channel_mode': _UNKNOWN,
+                'block_length': _UNKNOWN,
+                'subbands': _UNKNOWN,
+            }
+            address = properties.get('api.bluez5.address')
+            if address:
+                current_device['address'] = address
+            # Sample spec first so a decoded SBC configuration can override the rate.
+            match = _SAMPLE_SPEC_RE.search(sink.get('sample_specification', ''))
+            if match:
+                current_device['channels'] = match.group(1)
+                current_device['rate'] = match.group(2)
+            codec = properties.get('api.bluez5.codec')
+            if codec:
+                _decode_codec(current_device, codec)
+
+            devices.append(_device_from_dict(current_device))
+
+        return devices
+
+    @staticmethod
+    def _get_devices_text():
+        """Read sinks from the human-readable `pactl list sinks` output; None on failure"""
+        try:
+            with subprocess.Popen([BIN_PACTL, 'list', 'sinks'], stdout=subprocess.PIPE,
+                                  stderr=subprocess.DEVNULL, text=True,
+                                  close_fds=False) as proc:
+                # Parse while pactl is still writing; kill it if the sound server stops answering.
+                watchdog = threading.Timer(5, proc.kill)
+                watchdog.start()
+                try:
+                    devices = BitrateMonitor._parse_sinks(proc.stdout)
+                finally:
+                    watchdog.cancel()
+                if proc.wait() != 0:
+                    return None
 
             return devices
 
         except Exception as e:
             print(f"Error getting device info: {e}", file=sys.stderr)
-            return []
+            return None
+
+    @staticmethod
+    def _parse_sinks(lines):
+        """Parse `pactl list sinks` output into BluetoothDevice entries"""
+        devices = []
+        current_device = None
+
+        for line in lines:
+            if line.startswith('Sink #'):
+                _flush(current_device, devices)
+                current_device = {
+                    'is_bluetooth': False,
+                    'channel_mode': _UNKNOWN,
+                    'block_length': _UNKNOWN,
+                    'subbands': _UNKNOWN
+                }
+            elif current_device:
+                if 'Name:' in line:
+                    name = line.split(':', 1)[1].strip()
+                    current_device['name'] = name
+                    if 'bluez' in name:
+                        current_device['is_bluetooth'] = True
+                elif 'Description:' in line:
+                    current_device['description'] = line.split(':', 1)[1].strip()
+                elif 'api.bluez5.address' in line:
+                    address = line.split('=')[1].strip().strip('"')
+                    current_device['address'] = address
+                elif 'api.bluez5.codec' in line:
+                    codec = line.split('=')[1].strip().strip('"')
+                    _decode_codec(current_device, codec)
+                elif 'Sample Specification:' in line:
+                    spec = line.split(':', 1)[1].strip()
+                    match = _SAMPLE_SPEC_RE.search(spec)
+                    if match:
+                        current_device['channels'] = match.group(1)
+                        current_device['rate'] = match.group(2)
+
+        _flush(current_device, devices)
+
+        return devices
+
+
+# a2dp-codec-sbc.c patch applied by build_high_bitpool.sh; filled in with the chosen bitpool
+_PATCH_TMPL = """diff --git a/spa/plugins/bluez5/a2dp-codec-sbc.c b/spa/plugins/bluez5/a2dp-codec-sbc.c
+index fc55a03..935a4e0 100644
+--- a/spa/plugins/bluez5/a2dp-codec-sbc.c
++++ b/spa/plugins/bluez5/a2dp-codec-sbc.c
+@@ -79,8 +79,10 @@ static uint8_t default_bitpool(uint8_t freq, uint8_t mode, bool xq)
+ 	case SBC_SAMPLING_FREQ_44100:
+ 		switch (mode) {
+ 		case SBC_CHANNEL_MODE_MONO:
+-		case SBC_CHANNEL_MODE_DUAL_CHANNEL:
+ 			return xq ? 43 : 32;
++		case SBC_CHANNEL_MODE_DUAL_CHANNEL:
++			/* Custom bitpool %(bitpool)d for dual channel SBC-XQ at 44.1 kHz */
++			return xq ? %(bitpool)d : 32;
+
+ 		case SBC_CHANNEL_MODE_STEREO:
+ 		case SBC_CHANNEL_MODE_JOINT_STEREO:
+@@ -90,8 +92,10 @@ static uint8_t default_bitpool(uint8_t freq, uint8_t mode, bool xq)
+ 	case SBC_SAMPLING_FREQ_48000:
+ 		switch (mode) {
+ 		case SBC_CHANNEL_MODE_MONO:
+-		case SBC_CHANNEL_MODE_DUAL_CHANNEL:
+ 			return xq ? 39 : 29;
++		case SBC_CHANNEL_MODE_DUAL_CHANNEL:
++			/* Custom bitpool %(bitpool_48k)d for dual channel SBC-XQ at 48 kHz */
++			return xq ? %(bitpool_48k)d : 29;
+
+ 		case SBC_CHANNEL_MODE_STEREO:
+ 		case SBC_CHANNEL_MODE_JOINT_STEREO:
+@@ -204,8 +208,14 @@ static int codec_select_config(const struct media_codec *codec, uint32_t flags,
 
+ 	bitpool = default_bitpool(conf.frequency, conf.channel_mode, xq);
+
+-	conf.min_bitpool = SPA_MAX(SBC_MIN_BITPOOL, conf.min_bitpool);
+-	conf.max_bitpool = SPA_MIN(bitpool, conf.max_bitpool);
++	if (xq && conf.channel_mode == SBC_CHANNEL_MODE_DUAL_CHANNEL) {
++		/* Override sink limits: enforce high bitpool for SBC-XQ dual channel. */
++		conf.min_bitpool = bitpool;
++		conf.max_bitpool = bitpool;
++	} else {
++		conf.min_bitpool = SPA_MAX(SBC_MIN_BITPOOL, conf.min_bitpool);
++		conf.max_bitpool = SPA_MIN(bitpool, conf.max_bitpool);
++	}
+ 	memcpy(config, &conf, sizeof(conf));
 
-class BluetoothBitrateWindow(Adw.ApplicationWindow):
+ 	return sizeof(conf);
+"""
+
+
+class BluetoothBitrateWindow:
     """Main application window"""
 
     def __init__(self, **kwargs):
-        super().__init__(**kwargs)
+        Adw = _load_adw()
+        self.window = Adw.ApplicationWindow(**kwargs)
+        self.window.connect("close-request", self.on_close_request)
 
-        self.set_default_size(700, 600)
-        self.set_title("Bluetooth Bitrate Manager")
+        self.window.set_default_size(700, 600)
+        self.window.set_title("Bluetooth Bitrate Manager")
 
         # Main container
         self.main_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
-        self.set_content(self.main_box)
+        self.window.set_content(self.main_box)
 
         # Header bar
         header = Adw.HeaderBar()
@@ -372,7 +616,26 @@ class BluetoothBitrateWindow(Adw.ApplicationWindow):
 
         # Start monitoring
         self.monitoring = True
-        self.start_monitoring()
+        self._refresh_source_id = None
+        self._monitor_source_id = None
+        self._system_bus = None
+        self._bluez_subscriptions = []
+        self._pactl_subscribe = None
+        self._pactl_watch_id = None
+        self._pactl_retry_id = None
+        self._build_log_pending = []
+        self._build_log_pending_lines = 0
+        self._build_log_source_id = None
+        self._build_output_decoder = None
+        self._build_output_tail = ''
+        self._last_display_key = None
+        self._device_widgets = {}
+        # Event driven by default; poll only if neither event source is available.
+        watching_bluez = self.watch_bluez()
+        watching_pactl = self.watch_pactl()
+        if not watching_bluez and not watching_pactl:
+            self.start_monitoring()
+        GLib.idle_add(self.update_device_display)
 
     def create_monitor_tab(self):
         """Create the monitoring tab"""
@@ -389,14 +652,14 @@ class BluetoothBitrateWindow(Adw.ApplicationWindow):
         monitor_box.append(self.status_label)
 
         # Scrolled window for device list
-        scrolled = Gtk.ScrolledWindow()
-        scrolled.set_vexpand(True)
-        scrolled.set_hexpand(True)
-        monitor_box.append(scrolled)
+        self.device_scrolled = Gtk.ScrolledWindow()
+        self.device_scrolled.set_vexpand(True)
+        self.device_scrolled.set_hexpand(True)
+        monitor_box.append(self.device_scrolled)
 
         # Device list container
         self.device_list_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12)
-        scrolled.set_child(self.device_list_box)
+        self.device_scrolled.set_child(self.device_list_box)
 
         # Refresh button
         refresh_btn = Gtk.Button(label="Refresh Now")
@@ -526,6 +789,8 @@ class BluetoothBitrateWindow(Adw.ApplicationWindow):
         self.log_view.set_editable(False)
         self.log_view.set_monospace(True)
         self.log_buffer = self.log_view.get_buffer()
+        # Right gravity: text inserted at the end keeps this mark after it
+        self._log_end_mark = self.log_buffer.create_mark(None, self.log_buffer.get_end_iter(), False)
         scrolled.set_child(self.log_view)
 
         # Quick actions
@@ -545,15 +810,30 @@ class BluetoothBitrateWindow(Adw.ApplicationWindow):
 
     def update_device_display(self):
         """Update the device list display"""
-        # Clear existing widgets
-        child = self.device_list_box.get_first_child()
-        while child:
-            next_child = child.get_next_sibling()
-            self.device_list_box.remove(child)
-            child = next_child
-
         devices = BitrateMonitor.get_bluetooth_devices()
 
+        # Skip all widget work when nothing has changed since the last refresh.
+        display_key = tuple(devices)
+        if display_key == self._last_display_key:
+            return False  # Don't repeat if called from GLib.idle_add
+
+        names = tuple(device.name for device in devices)
+        if self._last_display_key is None or names != tuple(self._device_widgets):
+            self._rebuild_device_cards(devices)
+        self._last_display_key = display_key
+
+        for i, device in enumerate(devices, 1):
+            self._update_device_card(self._device_widgets[device.name], i, device)
+
+        return False  # Don't repeat if called from GLib.idle_add
+
+    def _rebuild_device_cards(self, devices):
+        """Recreate one empty card per device; _update_device_card fills in the values"""
+        # Swap in a fresh container; the old cards are released together with it
+        self.device_list_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12)
+        self.device_scrolled.set_child(self.device_list_box)
+        self._device_widgets = {}
+
         if not devices:
             no_devices = Gtk.Label(label="No Bluetooth audio devices found")
             no_devices.set_halign(Gtk.Align.CENTER)
@@ -561,7 +841,7 @@ class BluetoothBitrateWindow(Adw.ApplicationWindow):
             self.device_list_box.append(no_devices)
             return
 
-        for i, device in enumerate(devices, 1):
+        for device in devices:
             # Create a card for each device
             card = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
             card.add_css_class("card")
@@ -572,7 +852,6 @@ class BluetoothBitrateWindow(Adw.ApplicationWindow):
 
             # Device header
             header = Gtk.Label()
-            header.set_markup(f"<b>Device {i}: {device.description}</b>")
             header.set_halign(Gtk.Align.START)
             header.set_margin_start(12)
             header.set_margin_top(12)
@@ -587,85 +866,173 @@ class BluetoothBitrateWindow(Adw.ApplicationWindow):
             grid.set_margin_top(6)
             grid.set_margin_bottom(12)
 
-            # Codec
-            codec_label = Gtk.Label(label="Codec:")
-            codec_label.set_halign(Gtk.Align.START)
-            codec_value = Gtk.Label(label=device.codec)
-            codec_value.set_halign(Gtk.Align.START)
-            codec_value.add_css_class("monospace")
-            if device.codec == "SBC XQ":
-                codec_value.add_css_class("success")
-            grid.attach(codec_label, 0, 0, 1, 1)
-            grid.attach(codec_value, 1, 0, 1, 1)
-
-            # Bitrate
-            bitrate_label = Gtk.Label(label="Bitrate:")
-            bitrate_label.set_halign(Gtk.Align.START)
-            bitrate_value = Gtk.Label(label=device.bitrate)
-            bitrate_value.set_halign(Gtk.Align.START)
-            bitrate_value.add_css_class("monospace")
-            grid.attach(bitrate_label, 0, 1, 1, 1)
-            grid.attach(bitrate_value, 1, 1, 1, 1)
-
-            # Sample rate
-            if device.rate != "Unknown":
-                rate_label = Gtk.Label(label="Sample Rate:")
-                rate_label.set_halign(Gtk.Align.START)
-                rate_value = Gtk.Label(label=f"{device.rate} Hz")
-                rate_value.set_halign(Gtk.Align.START)
-                rate_value.add_css_class("monospace")
-                grid.attach(rate_label, 0, 2, 1, 1)
-                grid.attach(rate_value, 1, 2, 1, 1)
-
-            # Channel mode
-            if device.channel_mode != "Unknown":
-                mode_label = Gtk.Label(label="Channel Mode:")
-                mode_label.set_halign(Gtk.Align.START)
-                mode_value = Gtk.Label(label=device.channel_mode)
-                mode_value.set_halign(Gtk.Align.START)
-                mode_value.add_css_class("monospace")
-                grid.attach(mode_label, 0, 3, 1, 1)
-                grid.attach(mode_value, 1, 3, 1, 1)
-
-            if device.block_length != "Unknown" or device.subbands != "Unknown":
-                frame_label = Gtk.Label(label="SBC Frame:")
-                frame_label.set_halign(Gtk.Align.START)
-                parts = []
-                if device.block_length != "Unknown":
-                    parts.append(f"{device.block_length} blocks")
-                if device.subbands != "Unknown":
-                    parts.append(f"{device.subbands} subbands")
-                frame_value = Gtk.Label(label=" / ".join(parts) if parts else "Unknown")
-                frame_value.set_halign(Gtk.Align.START)
-                frame_value.add_css_class("monospace")
-                grid.attach(frame_label, 0, 4, 1, 1)
-                grid.attach(frame_value, 1, 4, 1, 1)
-
-            # Channels
-            if device.channels != "Unknown":
-                ch_label = Gtk.Label(label="Channels:")
-                ch_label.set_halign(Gtk.Align.START)
-                ch_value = Gtk.Label(label=device.channels)
-                ch_value.set_halign(Gtk.Align.START)
-                ch_value.add_css_class("monospace")
-                grid.attach(ch_label, 0, 5, 1, 1)
-                grid.attach(ch_value, 1, 5, 1, 1)
+            rows = {
+                field: _kv_row(grid, row, title)
+                for row, (field, title) in enumerate(DEVICE_ROWS)
+            }
 
             card.append(grid)
             self.device_list_box.append(card)
-
-        return False  # Don't repeat if called from GLib.idle_add
+            self._device_widgets[device.name] = (header, rows)
+
+    def _update_device_card(self, widgets, index, device):
+        """Push device values into an existing card, touching only labels that changed"""
+        header, rows = widgets
+        markup = f"<b>Device {index}: {device.description}</b>"
+        if header.get_label() != markup:
+            header.set_markup(markup)
+
+        values = _device_row_values(device)
+        for field, (key_label, value_label) in rows.items():
+            text = values.get(field)
+            visible = text is not None
+            key_label.set_visible(visible)
+            value_label.set_visible(visible)
+            if visible and value_label.get_label() != text:
+                value_label.set_label(text)
+
+        codec_value = rows["codec"][1]
+        if device.codec == "SBC XQ":
+            codec_value.add_css_class("success")
+        else:
+            codec_value.remove_css_class("success")
 
     def start_monitoring(self):
-        """Start the monitoring loop"""
-        def monitor_loop():
-            while self.monitoring:
-                GLib.idle_add(self.update_device_display)
-                import time
-                time.sleep(2)
-
-        thread = threading.Thread(target=monitor_loop, daemon=True)
-        thread.start()
+        """Poll the device list every 2 seconds on the main loop"""
+        self._monitor_source_id = GLib.timeout_add_seconds(2, self._on_monitor_tick)
+
+    def _on_monitor_tick(self):
+        if not self.monitoring:
+            self._monitor_source_id = None
+            return False
+        self.update_device_display()
+        return True
+
+    def watch_bluez(self):
+        """Refresh the device list when BlueZ reports device or transport changes.
+
+        Returns False when the system bus is unreachable so the caller can fall
+        back to polling.
+        """
+        try:
+            bus = Gio.bus_get_sync(Gio.BusType.SYSTEM, None)
+        except GLib.Error as exc:
+            print(f"BlueZ D-Bus unavailable, falling back to polling: {exc.message}", file=sys.stderr)
+            return False
+
+        self._system_bus = bus
+        for interface in BLUEZ_WATCHED_INTERFACES:
+            self._bluez_subscriptions.append(bus.signal_subscribe(
+                BLUEZ_SERVICE,
+                "org.freedesktop.DBus.Properties",
+                "PropertiesChanged",
+                None,
+                interface,
+                Gio.DBusSignalFlags.NONE,
+                self.on_bluez_signal,
+            ))
+        # Transports come and go as devices connect or switch codec.
+        for member in ("InterfacesAdded", "InterfacesRemoved"):
+            self._bluez_subscriptions.append(bus.signal_subscribe(
+                BLUEZ_SERVICE,
+                "org.freedesktop.DBus.ObjectManager",
+                member,
+                "/",
+                None,
+                Gio.DBusSignalFlags.NONE,
+                self.on_bluez_signal,
+            ))
+        return True
+
+    def on_bluez_signal(self, _connection, _sender, _path, _interface, signal, params):
+        """Handle a BlueZ D-Bus signal"""
+        args = params.unpack()
+        if signal == "PropertiesChanged":
+            interface, changed, invalidated = args
+            if (interface == "org.bluez.Device1"
+                    and BLUEZ_DEVICE_AUDIO_PROPERTIES.isdisjoint(changed)
+                    and BLUEZ_DEVICE_AUDIO_PROPERTIES.isdisjoint(invalidated)):
+                return
+        elif "org.bluez.MediaTransport1" not in args[1]:
+            # InterfacesAdded carries a dict of interfaces, InterfacesRemoved a list of names.
+            return
+
+        # Only a new or vanished transport, or a renegotiated codec, invalidates the cached SBC
+        # configuration; Volume, State and Delay updates leave it as it is.
+        if signal != "PropertiesChanged" or (
+                interface == "org.bluez.MediaTransport1"
+                and ("Configuration" in changed or "Configuration" in invalidated)):
+            bitrate_utils.clear_sbc_configuration_cache()
+        self.schedule_refresh()
+
+    def watch_pactl(self):
+        """Refresh when the sound server reports sink or card changes.
+
+        Returns False if `pactl subscribe` cannot be started.
+        """
+        try:
+            self._pactl_subscribe = subprocess.Popen(
+                [BIN_PACTL, 'subscribe'],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                close_fds=False,
+            )
+        except OSError as exc:
+            print(f"pactl subscribe unavailable: {exc}", file=sys.stderr)
+            return False
+
+        self._pactl_watch_id = GLib.io_add_watch(
+            self._pactl_subscribe.stdout.fileno(),
+            GLib.PRIORITY_DEFAULT,
+            GLib.IO_IN | GLib.IO_HUP | GLib.IO_ERR,
+            self.on_pactl_event,
+        )
+        return True
+
+    def on_pactl_event(self, fd, condition):
+        """Handle output from `pactl subscribe`"""
+        data = os.read(fd, 4096) if condition & GLib.IO_IN else b''
+        if data:
+            # Lines look like: Event 'change' on sink #52
+            if b'on sink #' in data or b'on card #' in data:
+                self.schedule_refresh()
+            return True
+
+        # pactl exited, usually because the sound server restarted; reconnect shortly.
+        self._pactl_watch_id = None
+        self._close_pactl_subscribe()
+        if self.monitoring:
+            self.schedule_refresh()
+            self._pactl_retry_id = GLib.timeout_add_seconds(5, self._on_pactl_retry)
+        return False
+
+    def _on_pactl_retry(self):
+        self._pactl_retry_id = None
+        if self.monitoring:
+            self.watch_pactl()
+        return False
+
+    def _close_pactl_subscribe(self):
+        if self._pactl_subscribe is None:
+            return
+        self._pactl_subscribe.terminate()
+        self._pactl_subscribe.wait()
+        self._pactl_subscribe.stdout.close()
+        self._pactl_subscribe = None
+
+    def schedule_refresh(self, delay_ms=250):
+        """Coalesce bursts of change notifications into a single refresh.
+
+        The short delay also gives PipeWire time to publish the sink after
+        BlueZ announces a new transport.
+        """
+        if self._refresh_source_id is None:
+            self._refresh_source_id = GLib.timeout_add(delay_ms, self._on_refresh_timeout)
+
+    def _on_refresh_timeout(self):
+        self._refresh_source_id = None
+        self.update_device_display()
+        return False
 
     def request_initial_privileges(self):
         """Prompt for elevated privileges once when the app starts."""
@@ -680,6 +1047,8 @@ class BluetoothBitrateWindow(Adw.ApplicationWindow):
 
     def on_refresh_clicked(self, button):
         """Handle refresh button click"""
+        # A manual refresh should not be stuck on a stale or missing transport lookup.
+        bitrate_utils.clear_sbc_configuration_cache()
         self.update_device_display()
 
     def calculate_sbc_bitrate(self, bitpool, sample_rate):
@@ -717,6 +1086,7 @@ class BluetoothBitrateWindow(Adw.ApplicationWindow):
         self.log_to_buffer("Starting build process...\n")
 
         def build_thread():
+            handed_off = False
             try:
                 # Get configuration
                 rate = "44100" if self.rate_combo.get_selected() == 0 else "48000"
@@ -738,52 +1108,7 @@ class BluetoothBitrateWindow(Adw.ApplicationWindow):
                 cache_dir.mkdir(parents=True, exist_ok=True)
                 custom_patch_path = cache_dir / "pipewire-sbc-custom-bitpool.patch"
 
-                patch_content = f"""diff --git a/spa/plugins/bluez5/a2dp-codec-sbc.c b/spa/plugins/bluez5/a2dp-codec-sbc.c
-index fc55a03..935a4e0 100644
---- a/spa/plugins/bluez5/a2dp-codec-sbc.c
-+++ b/spa/plugins/bluez5/a2dp-codec-sbc.c
-@@ -79,8 +79,10 @@ static uint8_t default_bitpool(uint8_t freq, uint8_t mode, bool xq)
- 	case SBC_SAMPLING_FREQ_44100:
- 		switch (mode) {{
- 		case SBC_CHANNEL_MODE_MONO:
--		case SBC_CHANNEL_MODE_DUAL_CHANNEL:
- 			return xq ? 43 : 32;
-+		case SBC_CHANNEL_MODE_DUAL_CHANNEL:
-+			/* Custom bitpool {bitpool} for dual channel SBC-XQ at 44.1 kHz */
-+			return xq ? {bitpool} : 32;
-
- 		case SBC_CHANNEL_MODE_STEREO:
- 		case SBC_CHANNEL_MODE_JOINT_STEREO:
-@@ -90,8 +92,10 @@ static uint8_t default_bitpool(uint8_t freq, uint8_t mode, bool xq)
- 	case SBC_SAMPLING_FREQ_48000:
- 		switch (mode) {{
- 		case SBC_CHANNEL_MODE_MONO:
--		case SBC_CHANNEL_MODE_DUAL_CHANNEL:
- 			return xq ? 39 : 29;
-+		case SBC_CHANNEL_MODE_DUAL_CHANNEL:
-+			/* Custom bitpool {bitpool_48k} for dual channel SBC-XQ at 48 kHz */
-+			return xq ? {bitpool_48k} : 29;
-
- 		case SBC_CHANNEL_MODE_STEREO:
- 		case SBC_CHANNEL_MODE_JOINT_STEREO:
-@@ -204,8 +208,14 @@ static int codec_select_config(const struct media_codec *codec, uint32_t flags,
-
- 	bitpool = default_bitpool(conf.frequency, conf.channel_mode, xq);
-
--	conf.min_bitpool = SPA_MAX(SBC_MIN_BITPOOL, conf.min_bitpool);
--	conf.max_bitpool = SPA_MIN(bitpool, conf.max_bitpool);
-+	if (xq && conf.channel_mode == SBC_CHANNEL_MODE_DUAL_CHANNEL) {{
-+		/* Override sink limits: enforce high bitpool for SBC-XQ dual channel. */
-+		conf.min_bitpool = bitpool;
-+		conf.max_bitpool = bitpool;
-+	}} else {{
-+		conf.min_bitpool = SPA_MAX(SBC_MIN_BITPOOL, conf.min_bitpool);
-+		conf.max_bitpool = SPA_MIN(bitpool, conf.max_bitpool);
-+	}}
- 	memcpy(config, &conf, sizeof(conf));
-
- 	return sizeof(conf);
-"""
+                patch_content = _PATCH_TMPL % {"bitpool": bitpool, "bitpool_48k": bitpool_48k}
 
                 with open(custom_patch_path, 'w') as f:
                     f.write(patch_content)
@@ -805,41 +1130,32 @@ index fc55a03..935a4e0 100644
                 config_path = config_dir / "51-bluetooth.conf"
 
                 try:
-                    mkdir_result = run_privileged_command([BIN_MKDIR, "-p", str(config_dir)])
-                    if mkdir_result.returncode != 0:
+                    mkdir_result = None
+                    # The sandbox's /etc is not the host's, so only trust the check outside Flatpak.
+                    if IS_FLATPAK or not config_dir.is_dir():
+                        mkdir_result = run_privileged_command([BIN_MKDIR, "-p", str(config_dir)])
+                    if mkdir_result is not None and mkdir_result.returncode != 0:
                         GLib.idle_add(
                             self.log_to_buffer,
                             f"Error creating {config_dir}: {mkdir_result.stderr or mkdir_result.stdout}\n"
                         )
                     else:
-                        # Create temp file in home dir so it's accessible from host when in Flatpak
-                        temp_dir = Path.home() / ".cache" / "bluetooth-bitrate-manager"
-                        temp_dir.mkdir(parents=True, exist_ok=True)
-                        temp_path = temp_dir / "wireplumber-config.tmp"
-
-                        with open(temp_path, "w") as tmp_file:
-                            tmp_file.write(config_content)
-
-                        try:
-                            install_result = run_privileged_command(
-                                [BIN_INSTALL, "-m644", str(temp_path), str(config_path)]
+                        # Feed the config over stdin; no temp file for the host to read back.
+                        install_result = run_privileged_command(
+                            [BIN_INSTALL, "-m644", "/dev/stdin", str(config_path)],
+                            text_input=config_content,
+                        )
+                        if install_result.returncode == 0:
+                            GLib.idle_add(
+                                self.log_to_buffer,
+                                f"WirePlumber configured at {config_path}\n"
+                            )
+                        else:
+                            GLib.idle_add(
+                                self.log_to_buffer,
+                                "Error installing WirePlumber config: "
+                                f"{install_result.stderr or install_result.stdout}\n"
                             )
-                            if install_result.returncode == 0:
-                                GLib.idle_add(
-                                    self.log_to_buffer,
-                                    f"WirePlumber configured at {config_path}\n"
-                                )
-                            else:
-                                GLib.idle_add(
-                                    self.log_to_buffer,
-                                    "Error installing WirePlumber config: "
-                                    f"{install_result.stderr or install_result.stdout}\n"
-                                )
-                        finally:
-                            try:
-                                temp_path.unlink(missing_ok=True)
-                            except OSError:
-                                pass
                 except RuntimeError as exc:
                     GLib.idle_add(
                         self.log_to_buffer,
@@ -862,10 +1178,7 @@ index fc55a03..935a4e0 100644
                     GLib.idle_add(button.set_sensitive, True)
                     return
 
-                # Detect if running in Flatpak
-                is_flatpak = os.path.exists('/.flatpak-info') or os.getenv('FLATPAK_ID')
-
-                if is_flatpak:
+                if IS_FLATPAK:
                     # Copy build script and patch to host-accessible location
                     host_script_dir = Path.home() / '.local/share/bluetooth-bitrate-manager'
                     host_script_dir.mkdir(parents=True, exist_ok=True)
@@ -881,7 +1194,7 @@ index fc55a03..935a4e0 100644
 
                     # Execute on host with host PATH/toolchain. Only pass PATCH_FILE.
                     command = [
-                        'flatpak-spawn', '--host',
+                        *_HOST_PREFIX,
                         '--env=PATCH_FILE=' + str(host_patch),
                         'bash', str(host_build_script)
                     ]
@@ -892,37 +1205,110 @@ index fc55a03..935a4e0 100644
                     # Normal execution (non-Flatpak)
                     command = ['bash', str(build_script)]
 
-                process = subprocess.Popen(
-                    command,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    text=True,
-                    bufsize=1,
-                    env=env
-                )
-
-                for line in process.stdout:
-                    GLib.idle_add(self.log_to_buffer, line)
-
-                process.wait()
-
-                if process.returncode == 0:
-                    GLib.idle_add(self.log_to_buffer,
-                                "\n✓ Build completed successfully!\n")
-                    GLib.idle_add(self.log_to_buffer,
-                                "Reconnect your Bluetooth device to use the new codec.\n")
-                else:
-                    GLib.idle_add(self.log_to_buffer,
-                                f"\n✗ Build failed with code {process.returncode}\n")
+                # The script itself runs from the main loop, which re-enables the button.
+                GLib.idle_add(self.run_build_script, command, env, button)
+                handed_off = True
 
             except Exception as e:
                 GLib.idle_add(self.log_to_buffer, f"\nError: {e}\n")
             finally:
-                GLib.idle_add(button.set_sensitive, True)
+                if not handed_off:
+                    GLib.idle_add(button.set_sensitive, True)
 
         thread = threading.Thread(target=build_thread, daemon=True)
         thread.start()
 
+    def run_build_script(self, command, env, button):
+        """Start the build script and stream its output into the log from the main loop"""
+        launcher = Gio.SubprocessLauncher.new(
+            Gio.SubprocessFlags.STDOUT_PIPE | Gio.SubprocessFlags.STDERR_MERGE
+        )
+        launcher.set_environ([f"{key}={value}" for key, value in env.items()])
+        try:
+            process = launcher.spawnv(command)
+        except GLib.Error as exc:
+            self.log_to_buffer(f"\nError: {exc.message}\n")
+            button.set_sensitive(True)
+            return False
+
+        # Raw 64 KiB reads, decoded in bulk; a line split across reads waits in the tail.
+        self._build_output_decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        self._build_output_tail = ''
+        process.get_stdout_pipe().read_bytes_async(
+            65536, GLib.PRIORITY_DEFAULT, None, self._on_build_output, process, button
+        )
+        return False  # For GLib.idle_add
+
+    def _on_build_output(self, stream, result, process, button):
+        try:
+            chunk = stream.read_bytes_finish(result).get_data()
+        except GLib.Error as exc:
+            self._flush_build_log()
+            self.log_to_buffer(f"\nError reading build output: {exc.message}\n")
+            process.force_exit()
+            process.wait_async(None, self._on_build_finished, button)
+            return
+
+        text = self._build_output_tail + self._build_output_decoder.decode(chunk, final=not chunk)
+        if chunk:
+            *lines, self._build_output_tail = text.split('\n')
+        else:
+            lines = [text]
+            self._build_output_tail = ''
+
+        kept = []
+        for line in lines:
+            # Progress bars redraw with '\r'; only the final state of the line is worth showing.
+            if '\r' in line:
+                line = line.rstrip('\r').rpartition('\r')[2]
+            if line.strip():
+                kept.append(line + "\n")
+        if kept:
+            self._queue_build_log(''.join(kept), len(kept))
+
+        if not chunk:
+            self._flush_build_log()
+            process.wait_async(None, self._on_build_finished, button)
+            return
+
+        stream.read_bytes_async(65536, GLib.PRIORITY_DEFAULT, None, self._on_build_output, process, button)
+
+    def _queue_build_log(self, text, line_count):
+        """Collect build output and append it to the log at most every 50 ms"""
+        self._build_log_pending.append(text)
+        self._build_log_pending_lines += line_count
+        if self._build_log_pending_lines >= 32:
+            self._flush_build_log()
+        elif self._build_log_source_id is None:
+            self._build_log_source_id = GLib.timeout_add(50, self._flush_build_log)
+
+    def _flush_build_log(self):
+        if self._build_log_source_id is not None:
+            GLib.source_remove(self._build_log_source_id)
+            self._build_log_source_id = None
+        if self._build_log_pending:
+            self.log_to_buffer(''.join(self._build_log_pending))
+            self._build_log_pending.clear()
+            self._build_log_pending_lines = 0
+        return False
+
+    def _on_build_finished(self, process, result, button):
+        try:
+            process.wait_finish(result)
+            if process.get_successful():
+                self.log_to_buffer("\n✓ Build completed successfully!\n")
+                self.log_to_buffer("Reconnect your Bluetooth device to use the new codec.\n")
+            else:
+                if process.get_if_exited():
+                    code = process.get_exit_status()
+                else:
+                    code = -process.get_term_sig()
+                self.log_to_buffer(f"\n✗ Build failed with code {code}\n")
+        except GLib.Error as exc:
+            self.log_to_buffer(f"\nError: {exc.message}\n")
+        finally:
+            button.set_sensitive(True)
+
     def on_restart_pipewire(self, button):
         """Restart PipeWire services"""
         self.log_to_buffer("Restarting PipeWire...\n")
@@ -942,17 +1328,19 @@ index fc55a03..935a4e0 100644
 
             for unit in units:
                 show_result = subprocess.run(
-                    _host_command(['systemctl', '--user', 'show', unit]),
+                    _host_command([BIN_SYSTEMCTL, '--user', 'show', unit]),
                     capture_output=True,
                     text=True,
+                    close_fds=False,
                 )
                 if show_result.returncode != 0:
                     continue
 
                 restart_result = subprocess.run(
-                    _host_command(['systemctl', '--user', 'restart', unit]),
+                    _host_command([BIN_SYSTEMCTL, '--user', 'restart', unit]),
                     capture_output=True,
                     text=True,
+                    close_fds=False,
                 )
                 if restart_result.returncode == 0:
                     restarted.append(unit)
@@ -1007,38 +1395,67 @@ index fc55a03..935a4e0 100644
 
     def log_to_buffer(self, text):
         """Add text to the log buffer"""
-        end_iter = self.log_buffer.get_end_iter()
-        self.log_buffer.insert(end_iter, text)
+        self.log_buffer.insert(self.log_buffer.get_end_iter(), text)
 
         # Auto-scroll to bottom
-        mark = self.log_buffer.create_mark(None, end_iter, False)
-        self.log_view.scroll_to_mark(mark, 0.0, True, 0.0, 1.0)
+        self.log_view.scroll_to_mark(self._log_end_mark, 0.0, True, 0.0, 1.0)
 
         return False  # For GLib.idle_add
 
-    def do_close_request(self):
+    def present(self):
+        """Show the window"""
+        self.window.present()
+
+    def on_close_request(self, _window):
         """Handle window close"""
         self.monitoring = False
+        stop_sudo_keepalive()
+        if self._system_bus is not None:
+            for subscription_id in self._bluez_subscriptions:
+                self._system_bus.signal_unsubscribe(subscription_id)
+            self._bluez_subscriptions = []
+        if self._refresh_source_id is not None:
+            GLib.source_remove(self._refresh_source_id)
+            self._refresh_source_id = None
+        if self._monitor_source_id is not None:
+            GLib.source_remove(self._monitor_source_id)
+            self._monitor_source_id = None
+        if self._pactl_watch_id is not None:
+            GLib.source_remove(self._pactl_watch_id)
+            self._pactl_watch_id = None
+        if self._pactl_retry_id is not None:
+            GLib.source_remove(self._pactl_retry_id)
+            self._pactl_retry_id = None
+        if self._build_log_source_id is not None:
+            GLib.source_remove(self._build_log_source_id)
+            self._build_log_source_id = None
+        self._close_pactl_subscribe()
         return False
 
 
-class BluetoothBitrateApp(Adw.Application):
+class BluetoothBitrateApp:
     """Main application"""
 
     def __init__(self):
-        super().__init__(application_id='com.github.ezrakhuzadi.BluetoothBitrateManager')
+        Adw = _load_adw()
+        self.app = Adw.Application(application_id='com.github.ezrakhuzadi.BluetoothBitrateManager')
+        self.app.connect("activate", self.on_activate)
         self.window = None
 
         # Enable dark theme support - follow system preference
         style_manager = Adw.StyleManager.get_default()
         style_manager.set_color_scheme(Adw.ColorScheme.PREFER_DARK)
 
-    def do_activate(self):
+    def on_activate(self, app):
         """Activate the application"""
         if not self.window:
-            self.window = BluetoothBitrateWindow(application=self)
+            self.window = BluetoothBitrateWindow(application=app)
         self.window.present()
 
+    def run(self, args):
+        """Run the GLib main loop until the application quits"""
+        return self.app.run(args)
+
 
 def main(argv: Optional[Sequence[str]] = None) -> int:
     """Main entry point"""
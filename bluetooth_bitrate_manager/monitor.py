@@ -5,30 +5,96 @@ Displays real-time codec and bitrate information for Bluetooth audio devices.
 """
 
 import argparse
+import codecs
+import contextlib
+import io
 import json
 import re
+import shutil
 import subprocess
 import sys
 import time
-from datetime import datetime
 from typing import Optional, Sequence
 
 from . import bitrate_utils
 
+_SPEC_RE = re.compile(r'(\d+)ch\s+(\d+)Hz')
 
-def get_bt_devices():
-    """Get Bluetooth audio devices and their codec info from PipeWire."""
-    try:
-        result = subprocess.run(['pw-dump'], capture_output=True, text=True)
-        if result.returncode != 0:
-            return []
+BIN_PACTL = shutil.which('pactl') or 'pactl'
+BIN_PW_DUMP = shutil.which('pw-dump') or 'pw-dump'
+
+_PW_NODE_TYPE = 'PipeWire:Interface:Node'
+# pw-dump can be asked for just one object type; cleared if this pw-dump cannot.
+_pw_dump_type_filter = True
+
+# Last full device read, keyed on a hash of `pactl list short sinks`
+_device_cache = {'sig': None, 'devices': None, 't': 0.0}
 
-        data = json.loads(result.stdout)
-        bt_devices = []
 
-        for item in data:
-            if item.get('type') != 'PipeWire:Interface:Node':
+def _iter_json_array(stream, chunk_size=65536):
+    """
+    Yield the elements of a top-level JSON array read from a binary stream.
+
+    Any JSON value may be an element, whatever the chunk boundaries. Only the element
+    being decoded is materialized, so large dumps never exist as one big string or
+    object graph.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    buf = ''
+    pos = 0
+    in_array = False
+    eof = False
+
+    while True:
+        while pos < len(buf) and buf[pos] in ' \t\r\n,':
+            pos += 1
+
+        if pos < len(buf):
+            if not in_array:
+                if buf[pos] != '[':
+                    raise ValueError('expected a JSON array')
+                in_array = True
+                pos += 1
                 continue
+            if buf[pos] == ']':
+                return
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                # Element not complete yet; read more unless the stream is exhausted.
+                if eof:
+                    raise
+            else:
+                # A number cut by the chunk boundary still decodes (``22`` of ``223``, ``1`` of
+                # ``1.5``), so only trust an element once the delimiter after it has arrived.
+                if eof or (end < len(buf) and buf[end] in ' \t\r\n,]'):
+                    pos = end
+                    yield item
+                    continue
+        elif eof:
+            return
+
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        buf = buf[pos:] + utf8.decode(chunk, final=eof)
+        pos = 0
+
+
+def _read_pw_dump(command):
+    """
+    Run pw-dump and collect its Bluetooth nodes.
+
+    Returns (bt_devices, node_count), or None if pw-dump failed.
+    """
+    bt_devices = []
+    node_count = 0
+    with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                          close_fds=False) as proc:
+        for item in _iter_json_array(proc.stdout):
+            if item.get('type') != _PW_NODE_TYPE:
+                continue
+            node_count += 1
 
             info = item.get('info', {})
             props = info.get('props', {})
@@ -68,25 +134,176 @@ def get_bt_devices():
 
             bt_devices.append(device_info)
 
-        return bt_devices
+    if proc.returncode != 0:
+        return None
+
+    return bt_devices, node_count
+
+
+def get_bt_devices():
+    """Get Bluetooth audio devices and their codec info from PipeWire."""
+    global _pw_dump_type_filter
+    try:
+        filtered = None
+        if _pw_dump_type_filter:
+            filtered = _read_pw_dump([BIN_PW_DUMP, _PW_NODE_TYPE])
+            if filtered is not None and filtered[1]:
+                return filtered[0]
+
+        result = _read_pw_dump([BIN_PW_DUMP])
+        if result is None:
+            return []
+        if filtered is not None and result[1]:
+            # Older pw-dump takes only a numeric id and found no nodes where a full dump
+            # does; stop asking for the filter. A failed run (e.g. PipeWire restarting)
+            # says nothing about support, so that keeps the filter on.
+            _pw_dump_type_filter = False
+        return result[0]
 
     except Exception as exc:
         print(f"Error: {exc}", file=sys.stderr)
         return []
 
 
+def _on_name(current_device, name):
+    current_device['name'] = name
+    if 'bluez' in name:
+        current_device['is_bluetooth'] = True
+
+
+def _on_description(current_device, description):
+    current_device['description'] = description
+
+
+def _on_address(current_device, address):
+    current_device['address'] = address
+
+
+def _codec_sbc(current_device, codec_lower):
+    is_xq = 'xq' in codec_lower
+    current_device['codec'] = 'SBC XQ' if is_xq else 'SBC'
+    config = bitrate_utils.fetch_sbc_configuration(current_device.get('address', '')) if current_device.get('address') else None
+    if config:
+        bitrate = bitrate_utils.sbc_bitrate_from_config(config)
+        bitpool = config.effective_bitpool
+        if bitrate and bitpool is not None:
+            formatted = bitrate_utils.format_bitrate(bitrate)
+            current_device['bitrate'] = f'{formatted} (bitpool {bitpool})'
+        else:
+            current_device['bitrate'] = '~552 kbps' if is_xq else '~328 kbps'
+        if config.sample_rate:
+            current_device['rate'] = str(config.sample_rate)
+        if config.channel_mode:
+            mode_label = bitrate_utils.format_channel_mode(config.channel_mode)
+            if mode_label:
+                current_device['channel_mode'] = mode_label
+        if config.block_length:
+            current_device['block_length'] = str(config.block_length)
+        if config.subbands:
+            current_device['subbands'] = str(config.subbands)
+    else:
+        current_device['bitrate'] = '~552 kbps' if is_xq else '~328 kbps'
+
+
+def _codec_ldac(current_device, codec_lower):
+    current_device['codec'] = 'LDAC'
+    if 'hq' in codec_lower:
+        current_device['bitrate'] = '~990 kbps'
+    elif 'sq' in codec_lower:
+        current_device['bitrate'] = '~660 kbps'
+    else:
+        current_device['bitrate'] = '~330-990 kbps'
+
+
+def _codec_aptx_hd(current_device, codec_lower):
+    current_device['codec'] = 'aptX HD'
+    current_device['bitrate'] = '576 kbps'
+
+
+def _codec_aptx(current_device, codec_lower):
+    current_device['codec'] = 'aptX'
+    current_device['bitrate'] = '352 kbps'
+
+
+def _codec_msbc(current_device, codec_lower):
+    current_device['codec'] = 'mSBC'
+    current_device['bitrate'] = '~64 kbps'
+
+
+def _codec_cvsd(current_device, codec_lower):
+    current_device['codec'] = 'CVSD'
+    current_device['bitrate'] = '~64 kbps'
+
+
+def _codec_aac(current_device, codec_lower):
+    current_device['codec'] = 'AAC'
+    current_device['bitrate'] = '~256 kbps'
+
+
+# Substring -> handler(current_device, codec_lower), checked in order. More specific
+# names come first so "aptx_hd" is not taken for "aptx" and "msbc" is not taken for "sbc".
+_CODEC_TABLE = (
+    ('aptx_hd', _codec_aptx_hd),
+    ('aptx', _codec_aptx),
+    ('ldac', _codec_ldac),
+    ('msbc', _codec_msbc),
+    ('cvsd', _codec_cvsd),
+    ('aac', _codec_aac),
+    ('sbc', _codec_sbc),
+)
+
+
+def _on_codec(current_device, codec):
+    codec_lower = codec.lower()
+    current_device['codec_raw'] = codec
+    for substring, handler in _CODEC_TABLE:
+        if substring in codec_lower:
+            handler(current_device, codec_lower)
+            return
+    current_device['codec'] = codec.upper()
+
+
+def _on_sample_spec(current_device, spec):
+    current_device['spec'] = spec
+    match = _SPEC_RE.search(spec)
+    if match:
+        current_device['channels'] = match.group(1)
+        current_device['rate'] = match.group(2)
+
+
+# `pactl list sinks` field name -> handler(current_device, value)
+_PACTL_FIELD_HANDLERS = {
+    'Name': _on_name,
+    'Description': _on_description,
+    'api.bluez5.address': _on_address,
+    'api.bluez5.codec': _on_codec,
+    'Sample Specification': _on_sample_spec,
+}
+
+# One match per "Sink #N" header, "Key: value" field or 'key = "value"' property we handle
+# Matched against the raw bytes so only the captured values are ever decoded.
+_PACTL_LINE_RE = re.compile(
+    rb'^(?:Sink #\d+'
+    rb'|[ \t]*(?P<key>Name|Description|Sample Specification):(?P<value>.*)'
+    rb'|[ \t]*(?P<prop>api\.bluez5\.(?:address|codec))[ \t]*=[ \t]*"(?P<prop_value>[^"\n]*)")',
+    re.M,
+)
+
+
 def get_pactl_bt_info():
     """Get Bluetooth info from pactl (more reliable)."""
     try:
-        result = subprocess.run(['pactl', 'list', 'sinks'], capture_output=True, text=True)
+        result = subprocess.run([BIN_PACTL, 'list', 'sinks'], capture_output=True, close_fds=False)
         if result.returncode != 0:
             return []
 
         devices = []
         current_device = None
 
-        for line in result.stdout.split('\n'):
-            if line.startswith('Sink #'):
+        # Only sink headers and the fields we handle match; everything else is skipped by re.
+        for match in _PACTL_LINE_RE.finditer(result.stdout):
+            key = match.group('key') or match.group('prop')
+            if key is None:
                 if current_device and current_device.get('is_bluetooth'):
                     devices.append(current_device)
                 current_device = {
@@ -96,77 +313,10 @@ def get_pactl_bt_info():
                     'subbands': 'Unknown',
                 }
             elif current_device is not None:
-                if 'Name:' in line:
-                    name = line.split(':', 1)[1].strip()
-                    current_device['name'] = name
-                    if 'bluez' in name:
-                        current_device['is_bluetooth'] = True
-                elif 'Description:' in line:
-                    current_device['description'] = line.split(':', 1)[1].strip()
-                elif 'api.bluez5.address' in line:
-                    address = line.split('=')[1].strip().strip('"')
-                    current_device['address'] = address
-                elif 'api.bluez5.codec' in line:
-                    codec = line.split('=')[1].strip().strip('"')
-                    codec_lower = codec.lower()
-                    current_device['codec_raw'] = codec
-
-                    if 'sbc' in codec_lower:
-                        is_xq = 'xq' in codec_lower
-                        current_device['codec'] = 'SBC XQ' if is_xq else 'SBC'
-                        config = bitrate_utils.fetch_sbc_configuration(current_device.get('address', '')) if current_device.get('address') else None
-                        if config:
-                            bitrate = bitrate_utils.sbc_bitrate_from_config(config)
-                            bitpool = config.effective_bitpool
-                            if bitrate and bitpool is not None:
-                                formatted = bitrate_utils.format_bitrate(bitrate)
-                                current_device['bitrate'] = f'{formatted} (bitpool {bitpool})'
-                            else:
-                                current_device['bitrate'] = '~552 kbps' if is_xq else '~328 kbps'
-                            if config.sample_rate:
-                                current_device['rate'] = str(config.sample_rate)
-                            if config.channel_mode:
-                                mode_label = bitrate_utils.format_channel_mode(config.channel_mode)
-                                if mode_label:
-                                    current_device['channel_mode'] = mode_label
-                            if config.block_length:
-                                current_device['block_length'] = str(config.block_length)
-                            if config.subbands:
-                                current_device['subbands'] = str(config.subbands)
-                        else:
-                            current_device['bitrate'] = '~552 kbps' if is_xq else '~328 kbps'
-                    elif 'aac' in codec_lower:
-                        current_device['codec'] = 'AAC'
-                        current_device['bitrate'] = '~256 kbps'
-                    elif 'aptx_hd' in codec_lower:
-                        current_device['codec'] = 'aptX HD'
-                        current_device['bitrate'] = '576 kbps'
-                    elif 'aptx' in codec_lower:
-                        current_device['codec'] = 'aptX'
-                        current_device['bitrate'] = '352 kbps'
-                    elif 'ldac' in codec_lower:
-                        current_device['codec'] = 'LDAC'
-                        if 'hq' in codec_lower:
-                            current_device['bitrate'] = '~990 kbps'
-                        elif 'sq' in codec_lower:
-                            current_device['bitrate'] = '~660 kbps'
-                        else:
-                            current_device['bitrate'] = '~330-990 kbps'
-                    elif 'msbc' in codec_lower:
-                        current_device['codec'] = 'mSBC'
-                        current_device['bitrate'] = '~64 kbps'
-                    elif 'cvsd' in codec_lower:
-                        current_device['codec'] = 'CVSD'
-                        current_device['bitrate'] = '~64 kbps'
-                    else:
-                        current_device['codec'] = codec.upper()
-                elif 'Sample Specification:' in line:
-                    spec = line.split(':', 1)[1].strip()
-                    current_device['spec'] = spec
-                    match = re.search(r'(\d+)ch\s+(\d+)Hz', spec)
-                    if match:
-                        current_device['channels'] = match.group(1)
-                        current_device['rate'] = match.group(2)
+                value = match.group('value') if match.group('key') else match.group('prop_value')
+                _PACTL_FIELD_HANDLERS[key.decode('ascii')](
+                    current_device, value.decode('utf-8', 'replace').strip()
+                )
 
         if current_device and current_device.get('is_bluetooth'):
             devices.append(current_device)
@@ -178,6 +328,44 @@ def get_pactl_bt_info():
         return []
 
 
+def get_devices_cached(interval=2):
+    """
+    Get devices, re-running the full pactl/pw-dump parse only when the short sink
+    listing changes (connect, disconnect, codec switch, state change) or the cached
+    result is older than five refresh intervals.
+    """
+    try:
+        short = subprocess.run([BIN_PACTL, 'list', 'short', 'sinks'], capture_output=True,
+                               close_fds=False)
+        signature = hash(short.stdout) if short.returncode == 0 else None
+    except OSError:
+        signature = None
+
+    now = time.monotonic()
+    if (signature is not None
+            and signature == _device_cache['sig']
+            and now - _device_cache['t'] < interval * 5):
+        return _device_cache['devices']
+
+    devices = get_pactl_bt_info()
+    if not devices:
+        devices = get_bt_devices()
+
+    _device_cache.update(sig=signature, devices=devices, t=now)
+    return devices
+
+
+# (label, key, suffix, hide 'Unknown'), in display order
+_INFO_FIELDS = (
+    ('Bitrate', 'bitrate', '', False),
+    ('Sample Rate', 'rate', ' Hz', True),
+    ('Channels', 'channels', '', True),
+    ('Channel Mode', 'channel_mode', '', True),
+)
+# (key, unit) parts of the "SBC Frame" line
+_SBC_FRAME_FIELDS = (('block_length', 'blocks'), ('subbands', 'subbands'))
+
+
 def format_device_info(device):
     """Format device info for display."""
     lines = [
@@ -185,64 +373,121 @@ def format_device_info(device):
         f"  Codec:  {device.get('codec', 'Unknown')}",
     ]
 
-    if device.get('bitrate'):
-        lines.append(f"  Bitrate: {device.get('bitrate')}")
-
-    if device.get('rate') and device.get('rate') != 'Unknown':
-        lines.append(f"  Sample Rate: {device['rate']} Hz")
-    if device.get('channels') and device.get('channels') != 'Unknown':
-        lines.append(f"  Channels: {device['channels']}")
-    if device.get('channel_mode') and device.get('channel_mode') != 'Unknown':
-        lines.append(f"  Channel Mode: {device['channel_mode']}")
-    block_length = device.get('block_length')
-    subbands = device.get('subbands')
-    if ((block_length and block_length != 'Unknown') or
-            (subbands and subbands != 'Unknown')):
-        parts = []
-        if block_length and block_length != 'Unknown':
-            parts.append(f"{block_length} blocks")
-        if subbands and subbands != 'Unknown':
-            parts.append(f"{subbands} subbands")
+    for label, key, suffix, hide_unknown in _INFO_FIELDS:
+        value = device.get(key)
+        if value and not (hide_unknown and value == 'Unknown'):
+            lines.append(f"  {label}: {value}{suffix}")
+
+    parts = []
+    for key, unit in _SBC_FRAME_FIELDS:
+        value = device.get(key)
+        if value and value != 'Unknown':
+            parts.append(f"{value} {unit}")
+    if parts:
         lines.append(f"  SBC Frame: {' / '.join(parts)}")
-    if device.get('codec_raw'):
-        lines.append(f"  Raw Codec: {device['codec_raw']}")
+
+    codec_raw = device.get('codec_raw')
+    if codec_raw:
+        lines.append(f"  Raw Codec: {codec_raw}")
 
     return '\n'.join(lines)
 
 
-def clear_screen():
-    """Clear terminal screen."""
-    print('\033[2J\033[H', end='')
+# Clear the terminal and home the cursor; prefixed to every plain-loop frame
+_CLEAR_SCREEN = '\033[2J\033[H'
+
+
+def _render_screen(devices, interval):
+    """Return the monitor screen for one tick as a list of lines."""
+    lines = [
+        "=" * 60,
+        "  Bluetooth Audio Bitrate Monitor",
+        "  " + time.strftime("%Y-%m-%d %H:%M:%S"),
+        "=" * 60,
+        "",
+    ]
+
+    if devices:
+        for idx, device in enumerate(devices, 1):
+            lines.append(f"[Device {idx}]")
+            lines.extend(format_device_info(device).split('\n'))
+            lines.append("")
+    else:
+        lines.append("  No Bluetooth audio devices found")
+        lines.append("  Make sure a Bluetooth audio device is connected")
+
+    lines.append("=" * 60)
+    lines.append(f"  Refreshing every {interval}s... (Ctrl+C to exit)")
+    return lines
+
+
+def _curses_loop(stdscr, interval):
+    """Redraw only the screen lines that changed since the previous tick."""
+    import curses
+
+    try:
+        curses.curs_set(0)
+    except curses.error:
+        pass
+
+    previous = []
+    size = None
+    while True:
+        # Diagnostics written to stderr would land between curses updates and never be
+        # repainted, so collect them and show them as part of the frame instead.
+        errors = io.StringIO()
+        with contextlib.redirect_stderr(errors):
+            devices = get_devices_cached(interval)
+        lines = _render_screen(devices, interval)
+        messages = errors.getvalue().splitlines()
+        if messages:
+            lines.append("")
+            lines.extend(f"  {message}" for message in messages)
+
+        height, width = stdscr.getmaxyx()
+        if (height, width) != size:
+            # Resized: everything on screen is stale.
+            size = (height, width)
+            previous = []
+            stdscr.erase()
+
+        for y in range(min(max(len(lines), len(previous)), height)):
+            line = lines[y] if y < len(lines) else ""
+            if y < len(previous) and previous[y] == line:
+                continue
+            stdscr.move(y, 0)
+            stdscr.clrtoeol()
+            stdscr.addnstr(y, 0, line, width - 1)
+        previous = lines
+
+        stdscr.noutrefresh()
+        curses.doupdate()
+        time.sleep(interval)
 
 
 def monitor_loop(interval=2):
     """Main monitoring loop."""
     try:
-        while True:
-            clear_screen()
-
-            print("=" * 60)
-            print("  Bluetooth Audio Bitrate Monitor")
-            print("  " + datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-            print("=" * 60)
-            print()
-
-            devices = get_pactl_bt_info()
-            if not devices:
-                devices = get_bt_devices()
-
-            if devices:
-                for idx, device in enumerate(devices, 1):
-                    print(f"[Device {idx}]")
-                    print(format_device_info(device))
-                    print()
+        if sys.stdout.isatty():
+            try:
+                # Imported here so --once still works on Python builds without _curses.
+                import curses
+            except ImportError:
+                pass
             else:
-                print("  No Bluetooth audio devices found")
-                print("  Make sure a Bluetooth audio device is connected")
-
-            print("=" * 60)
-            print(f"  Refreshing every {interval}s... (Ctrl+C to exit)")
-
+                try:
+                    curses.wrapper(_curses_loop, interval)
+                    return
+                except curses.error:
+                    # No usable terminfo entry for $TERM; the plain loop needs none.
+                    pass
+
+        # Not a terminal (or curses is unusable): fall back to clearing and reprinting
+        # every tick, in one write.
+        while True:
+            lines = _render_screen(get_devices_cached(interval), interval)
+            sys.stdout.write(_CLEAR_SCREEN + '\n'.join(lines) + '\n')
+            sys.stdout.flush()
             time.sleep(interval)
 
     except KeyboardInterrupt: